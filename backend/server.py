@@ -5,12 +5,28 @@ No usa frameworks, solo librerías estándar de Python
 """
 
 import asyncio
+import dataclasses
 import websockets
 import json
 import logging
+import os
 import random
+import signal
+import socket
+import sys
+import time
+import zlib
+from array import array
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, Set, List, Optional
+from typing import Dict, Set, List, Optional, Sequence, Tuple
+from websockets.extensions.base import Extension, ServerExtensionFactory
+from websockets.extensions.permessage_deflate import (
+    PerMessageDeflate,
+    ServerPerMessageDeflateFactory,
+)
+from websockets.frames import CTRL_OPCODES, DATA_OPCODES, OP_CONT, Frame
+from websockets.legacy.server import WebSocketServerProtocol
 
 # ==================== CONFIGURACIÓN ====================
 
@@ -29,6 +45,650 @@ logger = logging.getLogger(__name__)
 HOST = '0.0.0.0'
 PORT = 5001
 
+# Compresión permessage-deflate (solo navegadores, la ESP32 no comprime)
+COMPRESSION_MIN_SIZE = 512       # Mensajes menores se envían sin comprimir (bytes)
+COMPRESSION_WINDOW_BITS = 12     # Ventana de zlib: 2^12 = 4 KB por conexión
+COMPRESSION_MEM_LEVEL = 5        # Memoria interna de zlib (1-9)
+COMPRESSION_LEVEL = 6            # Nivel de compresión de zlib (1-9)
+COMPRESSION_CACHE_SIZE = 8       # Snapshots comprimidos compartidos entre clientes
+DEVICE_USER_AGENTS = ('arduino', 'esp32')  # User-Agent de dispositivos
+DEVICE_PATHS = ('/esp32',)                 # Rutas reservadas para dispositivos
+
+# Reinicio sin caída (drenado y entrega de estado)
+HANDOFF_FILE = 'game_state.handoff.json'   # Snapshot si no hay proceso sucesor
+HANDOFF_SOCKET = 'game_server.handoff.sock'  # Socket Unix para entregar el listener
+HANDOFF_TIMEOUT = 30             # Segundos esperando al proceso sucesor (SIGUSR1)
+HANDOFF_MAX_AGE = 300            # Snapshots más viejos no se restauran al iniciar
+RECONNECT_BASE_MS = 500          # Espera mínima antes de mover a un cliente
+RECONNECT_JITTER_MS = 5000       # Jitter aleatorio para evitar reconexiones en masa
+
+# Telemetría de dispositivos (memoria fija por dispositivo)
+DEFAULT_DEVICE_ID = 'esp32'
+TELEMETRY_METRICS = ('wifi_strength', 'errors', 'rtt_ms')
+TELEMETRY_RAW_SIZE = 360         # Muestras crudas por métrica
+TELEMETRY_MINUTE_SIZE = 1440     # 24 h en buckets de 1 minuto
+TELEMETRY_HOUR_SIZE = 168        # 7 días en buckets de 1 hora
+TELEMETRY_MAX_DEVICES = 16       # Dispositivos con historial (se descarta el menos reciente)
+TELEMETRY_PING_TIMEOUT = 5       # Segundos esperando el pong tras un comando
+
+# Timeouts de turno e inactividad (una sola rueda de temporizadores)
+TURN_TIMEOUT = 60                # Segundos antes de pasar el turno automáticamente
+ROOM_IDLE_TIMEOUT = 900          # Segundos sin actividad antes de cerrar la partida
+TIMER_TICK = 1.0                 # Resolución de la rueda (segundos)
+TIMER_WHEEL_SLOTS = 64           # Ranuras por nivel
+TIMER_WHEEL_LEVELS = 4           # 64^4 ticks ≈ 194 días de alcance
+
+# ==================== COMPRESIÓN ====================
+
+class CompressionStats:
+    """Acumula métricas de compresión de todas las conexiones"""
+    
+    def __init__(self):
+        """Inicializa los contadores en cero"""
+        self.messages_compressed = 0
+        self.messages_uncompressed = 0
+        self.device_messages = 0
+        self.cache_hits = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cpu_seconds = 0.0
+    
+    def record(self, size_in: int, size_out: int, elapsed: float, cached: bool = False):
+        """
+        Registra un mensaje comprimido
+        
+        Args:
+            size_in: Tamaño original en bytes
+            size_out: Tamaño comprimido en bytes
+            elapsed: Segundos de CPU dedicados a zlib
+            cached: True si el resultado salió de la caché compartida
+        """
+        self.messages_compressed += 1
+        self.bytes_in += size_in
+        self.bytes_out += size_out
+        self.cpu_seconds += elapsed
+        if cached:
+            self.cache_hits += 1
+    
+    def get_stats(self) -> Dict:
+        """
+        Obtiene un resumen de las métricas
+        
+        Returns:
+            Dict con contadores, ratio de compresión y costo de CPU
+        """
+        ratio = self.bytes_out / self.bytes_in if self.bytes_in else 1.0
+        return {
+            'messages_compressed': self.messages_compressed,
+            'messages_uncompressed': self.messages_uncompressed,
+            'device_messages': self.device_messages,
+            'cache_hits': self.cache_hits,
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+            'compression_ratio': round(ratio, 4),
+            'cpu_ms': round(self.cpu_seconds * 1000, 3)
+        }
+
+compression_stats = CompressionStats()
+
+# Snapshots comprimidos una sola vez: {(datos, window_bits): datos_comprimidos}
+_compressed_cache: 'OrderedDict[Tuple[bytes, int], bytes]' = OrderedDict()
+
+class SelectivePerMessageDeflate(PerMessageDeflate):
+    """
+    permessage-deflate que solo comprime mensajes grandes
+    
+    Los mensajes menores a COMPRESSION_MIN_SIZE se envían sin el bit RSV1
+    (RFC 7692 permite elegir por mensaje). Sin context takeover cada
+    mensaje se comprime de forma independiente, así que el resultado es
+    idéntico para todos los clientes y se comparte mediante una caché.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.skip_message = False
+    
+    def encode(self, frame: Frame) -> Frame:
+        """
+        Codifica un frame saliente
+        
+        Args:
+            frame: Frame a enviar
+            
+        Returns:
+            Frame comprimido o sin cambios
+        """
+        if frame.opcode in CTRL_OPCODES:
+            return frame
+        
+        if frame.opcode is OP_CONT:
+            if self.skip_message:
+                return frame
+        elif len(frame.data) < COMPRESSION_MIN_SIZE:
+            self.skip_message = not frame.fin
+            compression_stats.messages_uncompressed += 1
+            return frame
+        else:
+            self.skip_message = False
+            # Mensaje completo sin contexto: se puede compartir entre clientes
+            if frame.fin and self.local_no_context_takeover:
+                return self._encode_shared(frame)
+        
+        start = time.thread_time()
+        encoded = super().encode(frame)
+        compression_stats.record(
+            len(frame.data), len(encoded.data), time.thread_time() - start
+        )
+        return encoded
+    
+    def _encode_shared(self, frame: Frame) -> Frame:
+        """
+        Comprime un mensaje completo reutilizando la caché compartida
+        
+        Args:
+            frame: Frame con el mensaje completo
+            
+        Returns:
+            Frame comprimido con RSV1 activo
+        """
+        key = (frame.data, self.local_max_window_bits)
+        data = _compressed_cache.get(key)
+        
+        if data is not None:
+            _compressed_cache.move_to_end(key)
+            compression_stats.record(len(frame.data), len(data), 0.0, cached=True)
+        else:
+            start = time.thread_time()
+            encoder = zlib.compressobj(
+                wbits=-self.local_max_window_bits, **self.compress_settings
+            )
+            data = encoder.compress(frame.data) + encoder.flush(zlib.Z_SYNC_FLUSH)
+            # Quitar el bloque vacío final (RFC 7692, sección 7.2.1)
+            if data.endswith(b'\x00\x00\xff\xff'):
+                data = data[:-4]
+            compression_stats.record(
+                len(frame.data), len(data), time.thread_time() - start
+            )
+            
+            _compressed_cache[key] = data
+            if len(_compressed_cache) > COMPRESSION_CACHE_SIZE:
+                _compressed_cache.popitem(last=False)
+        
+        return dataclasses.replace(frame, rsv1=True, data=data)
+
+class AdaptiveDeflateFactory(ServerPerMessageDeflateFactory):
+    """Negocia permessage-deflate usando SelectivePerMessageDeflate"""
+    
+    def process_request_params(
+        self,
+        params: Sequence[Tuple[str, Optional[str]]],
+        accepted_extensions: Sequence[Extension],
+    ) -> Tuple[List[Tuple[str, Optional[str]]], PerMessageDeflate]:
+        response_params, extension = super().process_request_params(
+            params, accepted_extensions
+        )
+        return response_params, SelectivePerMessageDeflate(
+            extension.remote_no_context_takeover,
+            extension.local_no_context_takeover,
+            extension.remote_max_window_bits,
+            extension.local_max_window_bits,
+            extension.compress_settings
+        )
+
+def build_browser_compression() -> ServerPerMessageDeflateFactory:
+    """
+    Crea la configuración de compresión para navegadores
+    
+    Sin context takeover en ambos sentidos zlib no conserva memoria entre
+    mensajes, así que el costo por conexión queda acotado.
+    
+    Returns:
+        Fábrica de la extensión permessage-deflate
+    """
+    return AdaptiveDeflateFactory(
+        server_no_context_takeover=True,
+        client_no_context_takeover=True,
+        server_max_window_bits=COMPRESSION_WINDOW_BITS,
+        client_max_window_bits=COMPRESSION_WINDOW_BITS,
+        compress_settings={
+            'memLevel': COMPRESSION_MEM_LEVEL,
+            'level': COMPRESSION_LEVEL
+        }
+    )
+
+class GameServerProtocol(WebSocketServerProtocol):
+    """Protocolo del servidor que elige la compresión según el tipo de cliente"""
+    
+    client_profile = 'browser'
+    
+    def process_extensions(
+        self,
+        headers: websockets.Headers,
+        available_extensions: Optional[Sequence[ServerExtensionFactory]],
+    ) -> Tuple[Optional[str], List[Extension]]:
+        """
+        Desactiva las extensiones para dispositivos como la ESP32
+        
+        Args:
+            headers: Cabeceras HTTP del handshake
+            available_extensions: Extensiones configuradas en el servidor
+            
+        Returns:
+            Cabecera Sec-WebSocket-Extensions y extensiones aceptadas
+        """
+        user_agent = headers.get('User-Agent', '').lower()
+        if self.path in DEVICE_PATHS or any(ua in user_agent for ua in DEVICE_USER_AGENTS):
+            self.client_profile = 'device'
+            logger.debug(f"Compresión desactivada para dispositivo: {user_agent}")
+            return None, []
+        
+        return super().process_extensions(headers, available_extensions)
+    
+    def write_frame_sync(self, fin: bool, opcode: int, data: bytes):
+        """Cuenta los mensajes enviados sin extensión a dispositivos"""
+        if self.client_profile == 'device' and opcode in DATA_OPCODES:
+            compression_stats.device_messages += 1
+        super().write_frame_sync(fin, opcode, data)
+
+# ==================== TELEMETRÍA ====================
+
+class RingBuffer:
+    """
+    Buffer circular de tamaño fijo respaldado por arrays
+    
+    Cada entrada guarda (timestamp, promedio, mínimo, máximo). La memoria se
+    reserva completa al crearlo y nunca crece; al llenarse se sobrescribe
+    la entrada más antigua.
+    """
+    
+    def __init__(self, capacity: int):
+        """
+        Reserva los arrays del buffer
+        
+        Args:
+            capacity: Número máximo de entradas
+        """
+        self.capacity = capacity
+        self.timestamps = array('d', [0.0]) * capacity
+        self.avg = array('d', [0.0]) * capacity
+        self.low = array('d', [0.0]) * capacity
+        self.high = array('d', [0.0]) * capacity
+        self.head = 0  # Próxima posición a escribir
+        self.count = 0
+    
+    def append(self, timestamp: float, avg: float, low: float, high: float):
+        """
+        Agrega una entrada, descartando la más antigua si está lleno
+        
+        Args:
+            timestamp: Segundos desde epoch (no decreciente)
+            avg: Valor promedio
+            low: Valor mínimo
+            high: Valor máximo
+        """
+        i = self.head
+        self.timestamps[i] = timestamp
+        self.avg[i] = avg
+        self.low[i] = low
+        self.high[i] = high
+        
+        self.head = (i + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+    
+    def _index(self, offset: int) -> int:
+        """Convierte una posición lógica (0 = más antigua) en índice físico"""
+        return (self.head - self.count + offset) % self.capacity
+    
+    def oldest(self) -> Optional[float]:
+        """
+        Obtiene el timestamp más antiguo almacenado
+        
+        Returns:
+            Timestamp o None si está vacío
+        """
+        if not self.count:
+            return None
+        return self.timestamps[self._index(0)]
+    
+    def query(self, start: float, end: float) -> List[List[float]]:
+        """
+        Obtiene las entradas con timestamp en [start, end]
+        
+        Busca el inicio con bisección, así que solo recorre las entradas
+        devueltas.
+        
+        Args:
+            start: Timestamp inicial (inclusivo)
+            end: Timestamp final (inclusivo)
+            
+        Returns:
+            Lista de [timestamp, promedio, mínimo, máximo]
+        """
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.timestamps[self._index(mid)] < start:
+                lo = mid + 1
+            else:
+                hi = mid
+        
+        points = []
+        for offset in range(lo, self.count):
+            i = self._index(offset)
+            if self.timestamps[i] > end:
+                break
+            points.append([self.timestamps[i], self.avg[i], self.low[i], self.high[i]])
+        return points
+
+class TimeSeries:
+    """Serie de una métrica con niveles crudo, 1 minuto y 1 hora"""
+    
+    # (nombre, segundos por bucket, capacidad)
+    TIERS = (('1m', 60, TELEMETRY_MINUTE_SIZE), ('1h', 3600, TELEMETRY_HOUR_SIZE))
+    
+    def __init__(self):
+        """Crea los buffers de cada nivel"""
+        self.raw = RingBuffer(TELEMETRY_RAW_SIZE)
+        self.tiers = {name: RingBuffer(size) for name, _, size in self.TIERS}
+        self.last_timestamp = 0.0
+        # Bucket en curso por nivel: [inicio, suma, cantidad, mínimo, máximo]
+        self.buckets: Dict[str, Optional[List[float]]] = {name: None for name, _, _ in self.TIERS}
+    
+    def add(self, timestamp: float, value: float):
+        """
+        Registra una muestra y la acumula en los niveles agregados
+        
+        Args:
+            timestamp: Segundos desde epoch
+            value: Valor de la muestra
+        """
+        # El reloj puede retroceder (NTP): los buffers deben quedar ordenados
+        timestamp = max(timestamp, self.last_timestamp)
+        self.last_timestamp = timestamp
+        
+        self.raw.append(timestamp, value, value, value)
+        
+        for name, seconds, _ in self.TIERS:
+            bucket_start = timestamp - timestamp % seconds
+            bucket = self.buckets[name]
+            
+            # Cerrar el bucket anterior al cambiar de intervalo
+            if bucket and bucket[0] != bucket_start:
+                self.tiers[name].append(bucket[0], bucket[1] / bucket[2], bucket[3], bucket[4])
+                bucket = None
+            
+            if bucket is None:
+                self.buckets[name] = [bucket_start, value, 1, value, value]
+            else:
+                bucket[1] += value
+                bucket[2] += 1
+                bucket[3] = min(bucket[3], value)
+                bucket[4] = max(bucket[4], value)
+    
+    def pick_resolution(self, start: float) -> str:
+        """
+        Elige el nivel más detallado que aún cubre el inicio del rango
+        
+        Args:
+            start: Timestamp inicial de la consulta
+            
+        Returns:
+            'raw', '1m' o '1h'
+        """
+        candidates = [('raw', self.raw)] + [(name, self.tiers[name]) for name, _, _ in self.TIERS[:-1]]
+        for name, buffer in candidates:
+            # Un buffer que no se ha llenado conserva toda la historia
+            if buffer.count < buffer.capacity or start >= buffer.oldest():
+                return name
+        return self.TIERS[-1][0]
+    
+    def query(self, start: float, end: float, resolution: Optional[str] = None) -> Dict:
+        """
+        Consulta un rango de tiempo
+        
+        Args:
+            start: Timestamp inicial
+            end: Timestamp final
+            resolution: 'raw', '1m', '1h' o None para elegir automáticamente
+            
+        Returns:
+            Dict con la resolución usada y los puntos [ts, promedio, mín, máx]
+            
+        Raises:
+            ValueError: Si la resolución no existe
+        """
+        if resolution is None:
+            resolution = self.pick_resolution(start)
+        
+        if resolution == 'raw':
+            return {'resolution': 'raw', 'points': self.raw.query(start, end)}
+        if resolution not in self.tiers:
+            raise ValueError(f"Resolución desconocida: {resolution}")
+        
+        points = self.tiers[resolution].query(start, end)
+        
+        # Incluir el bucket en curso como punto parcial
+        bucket = self.buckets[resolution]
+        if bucket and start <= bucket[0] <= end:
+            points.append([bucket[0], bucket[1] / bucket[2], bucket[3], bucket[4]])
+        
+        return {'resolution': resolution, 'points': points}
+
+class TelemetryStore:
+    """Guarda las series de telemetría de cada dispositivo"""
+    
+    def __init__(self):
+        """Inicializa el almacén vacío"""
+        # Orden de actualización: el primero es el menos reciente
+        self.devices: 'OrderedDict[str, Dict[str, TimeSeries]]' = OrderedDict()
+    
+    def record(self, device_id: str, metric: str, value: float, timestamp: Optional[float] = None):
+        """
+        Registra una muestra de un dispositivo
+        
+        Args:
+            device_id: Identificador del dispositivo
+            metric: Una de TELEMETRY_METRICS
+            value: Valor de la muestra
+            timestamp: Segundos desde epoch (por defecto, ahora)
+        """
+        if device_id in self.devices:
+            self.devices.move_to_end(device_id)
+        else:
+            if len(self.devices) >= TELEMETRY_MAX_DEVICES:
+                evicted, _ = self.devices.popitem(last=False)
+                logger.warning(f"Límite de dispositivos alcanzado, se descarta {evicted}")
+            self.devices[device_id] = {name: TimeSeries() for name in TELEMETRY_METRICS}
+        
+        self.devices[device_id][metric].add(
+            time.time() if timestamp is None else timestamp, float(value)
+        )
+    
+    def query(self, device_id: str, metric: str, start: float, end: float,
+              resolution: Optional[str] = None) -> Dict:
+        """
+        Consulta un rango de una métrica
+        
+        Args:
+            device_id: Identificador del dispositivo
+            metric: Una de TELEMETRY_METRICS
+            start: Timestamp inicial
+            end: Timestamp final
+            resolution: 'raw', '1m', '1h' o None
+            
+        Returns:
+            Dict con la resolución usada y los puntos
+            
+        Raises:
+            KeyError: Si el dispositivo o la métrica no existen
+            ValueError: Si la resolución no existe
+        """
+        return self.devices[device_id][metric].query(start, end, resolution)
+
+# ==================== TEMPORIZADORES ====================
+
+class Timer:
+    """Temporizador registrado en la rueda"""
+    
+    __slots__ = ('key', 'expires', 'callback', 'level', 'slot')
+    
+    def __init__(self, key, expires: int, callback):
+        """
+        Crea un temporizador
+        
+        Args:
+            key: Identificador único (reprogramar la misma llave lo reemplaza)
+            expires: Tick absoluto en el que vence
+            callback: Corrutina sin argumentos a ejecutar al vencer
+        """
+        self.key = key
+        self.expires = expires
+        self.callback = callback
+        self.level = 0
+        self.slot = 0
+
+class TimerWheel:
+    """
+    Rueda de temporizadores jerárquica compartida por todas las partidas
+    
+    Cada nivel tiene TIMER_WHEEL_SLOTS ranuras; el nivel N cubre
+    SLOTS^(N+1) ticks. Programar y cancelar es O(1) y cada tick solo toca
+    la ranura actual, sin importar cuántos temporizadores haya pendientes.
+    Los temporizadores de niveles altos bajan de nivel (cascada) al
+    acercarse su vencimiento.
+    """
+    
+    def __init__(self, tick: float = TIMER_TICK, slots: int = TIMER_WHEEL_SLOTS,
+                 levels: int = TIMER_WHEEL_LEVELS):
+        """
+        Inicializa la rueda vacía
+        
+        Args:
+            tick: Segundos por tick
+            slots: Ranuras por nivel
+            levels: Número de niveles
+        """
+        self.tick = tick
+        self.slots = slots
+        self.levels = levels
+        self.wheels: List[List[Dict]] = [[{} for _ in range(slots)] for _ in range(levels)]
+        self.timers: Dict = {}
+        self.current_tick = 0
+        self.tasks: Set[asyncio.Task] = set()
+    
+    def schedule(self, key, delay: float, callback):
+        """
+        Programa (o reprograma) un temporizador
+        
+        Args:
+            key: Identificador del temporizador
+            delay: Segundos hasta el vencimiento
+            callback: Corrutina sin argumentos a ejecutar al vencer
+        """
+        self.cancel(key)
+        ticks = max(1, int(-(-delay // self.tick)))  # Redondeo hacia arriba
+        timer = Timer(key, self.current_tick + ticks, callback)
+        self.timers[key] = timer
+        self._place(timer)
+    
+    def cancel(self, key) -> bool:
+        """
+        Cancela un temporizador
+        
+        Args:
+            key: Identificador del temporizador
+            
+        Returns:
+            True si existía
+        """
+        timer = self.timers.pop(key, None)
+        if timer is None:
+            return False
+        del self.wheels[timer.level][timer.slot][key]
+        return True
+    
+    def _place(self, timer: Timer):
+        """Coloca un temporizador en el nivel que corresponde a su distancia"""
+        delta = timer.expires - self.current_tick
+        level = 0
+        while level < self.levels - 1 and delta >= self.slots ** (level + 1):
+            level += 1
+        
+        span = self.slots ** level
+        # Más allá del alcance de la rueda se acota al último nivel
+        expires = min(timer.expires, self.current_tick + span * self.slots - 1)
+        timer.level = level
+        timer.slot = (expires // span) % self.slots
+        self.wheels[level][timer.slot][timer.key] = timer
+    
+    def advance(self) -> List[Timer]:
+        """
+        Avanza un tick
+        
+        Returns:
+            Temporizadores vencidos (ya retirados de la rueda)
+        """
+        self.current_tick += 1
+        
+        # Cascada: de los niveles altos a los bajos
+        for level in range(self.levels - 1, 0, -1):
+            span = self.slots ** level
+            if self.current_tick % span:
+                continue
+            slot = self.wheels[level][(self.current_tick // span) % self.slots]
+            pending = list(slot.values())
+            slot.clear()
+            for timer in pending:
+                self._place(timer)
+        
+        slot = self.wheels[0][self.current_tick % self.slots]
+        expired = [timer for timer in slot.values() if timer.expires <= self.current_tick]
+        for timer in expired:
+            del slot[timer.key]
+            del self.timers[timer.key]
+        return expired
+    
+    async def run(self):
+        """
+        Tarea única que avanza la rueda
+        
+        Los vencimientos se lanzan como tareas: un cliente lento en un
+        broadcast no detiene la rueda compartida.
+        """
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        logger.info(f"⏲️  Rueda de temporizadores iniciada (tick {self.tick}s)")
+        
+        while True:
+            await asyncio.sleep(self.tick)
+            
+            # Recuperar ticks perdidos si el loop estuvo ocupado
+            target = int((loop.time() - started) / self.tick)
+            while self.current_tick < target:
+                for timer in self.advance():
+                    self._dispatch(timer)
+    
+    def _dispatch(self, timer: Timer):
+        """
+        Ejecuta el callback de un temporizador vencido como tarea
+        
+        Args:
+            timer: Temporizador vencido
+        """
+        task = asyncio.ensure_future(timer.callback())
+        self.tasks.add(task)
+        
+        def done(task: asyncio.Task):
+            self.tasks.discard(task)
+            if not task.cancelled() and task.exception():
+                logger.error(
+                    f"Error en temporizador {timer.key}: {task.exception()}",
+                    exc_info=task.exception()
+                )
+        
+        task.add_done_callback(done)
+
 # ==================== ESTADO DEL JUEGO ====================
 
 class GameState:
@@ -45,6 +705,10 @@ class GameState:
         self.game_started = False
         self.winner = None
         
+        # Timeouts de la partida (segundos)
+        self.turn_timeout = TURN_TIMEOUT
+        self.idle_timeout = ROOM_IDLE_TIMEOUT
+        
         # Configuración del tablero
         self.board_size = 100
         self.snakes = {
@@ -178,6 +842,53 @@ class GameState:
             'winner': self.winner,
             'board_size': self.board_size
         }
+    
+    def to_snapshot(self) -> Dict:
+        """
+        Serializa el estado completo, incluido el tablero
+        
+        Returns:
+            Dict serializable a JSON para entregar a otro proceso
+        """
+        snapshot = self.get_state()
+        snapshot['snakes'] = self.snakes
+        snapshot['ladders'] = self.ladders
+        snapshot['turn_timeout'] = self.turn_timeout
+        snapshot['idle_timeout'] = self.idle_timeout
+        return snapshot
+    
+    def restore(self, snapshot: Dict):
+        """
+        Restaura el estado desde un snapshot de to_snapshot()
+        
+        Args:
+            snapshot: Dict leído de JSON (las llaves numéricas llegan como str)
+            
+        Raises:
+            KeyError, TypeError, ValueError, AttributeError: Si el snapshot no
+                tiene la forma esperada (el estado puede quedar a medias)
+        """
+        players = {int(pid): player for pid, player in snapshot['players'].items()}
+        for player in players.values():
+            missing = {'id', 'name', 'color', 'position', 'moves'} - player.keys()
+            if missing:
+                raise ValueError(f"Jugador sin campos: {sorted(missing)}")
+        if players and snapshot['current_player'] not in players:
+            raise ValueError(f"Jugador actual inválido: {snapshot['current_player']}")
+        
+        self.players = players
+        self.current_player = snapshot['current_player']
+        self.dice_value = snapshot['dice_value']
+        self.turn_number = snapshot['turn_number']
+        self.game_started = snapshot['game_started']
+        self.winner = snapshot['winner']
+        self.board_size = snapshot['board_size']
+        self.snakes = {int(k): v for k, v in snapshot['snakes'].items()}
+        self.ladders = {int(k): v for k, v in snapshot['ladders'].items()}
+        self.turn_timeout = snapshot.get('turn_timeout', TURN_TIMEOUT)
+        self.idle_timeout = snapshot.get('idle_timeout', ROOM_IDLE_TIMEOUT)
+        
+        logger.info(f"Estado restaurado: {len(self.players)} jugadores, turno {self.turn_number}")
 
 # ==================== GESTOR DE CONEXIONES ====================
 
@@ -189,6 +900,8 @@ class ConnectionManager:
         self.active_connections: Set[websockets.WebSocketServerProtocol] = set()
         self.esp32_connection: Optional[websockets.WebSocketServerProtocol] = None
         self.client_types: Dict[websockets.WebSocketServerProtocol, str] = {}
+        self.device_ids: Dict[websockets.WebSocketServerProtocol, str] = {}
+        self.rtt_tasks: Set[asyncio.Task] = set()
         
         logger.info("ConnectionManager inicializado")
     
@@ -221,6 +934,7 @@ class ConnectionManager:
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
             client_type = self.client_types.pop(websocket, 'unknown')
+            self.device_ids.pop(websocket, None)
             
             if websocket == self.esp32_connection:
                 self.esp32_connection = None
@@ -275,23 +989,454 @@ class ConnectionManager:
         try:
             await self.esp32_connection.send(json.dumps(message))
             logger.debug("Comando enviado exitosamente a ESP32")
+            
+            # El pong llega después de que la ESP32 leyó el comando
+            device_id = self.device_ids.get(self.esp32_connection, DEFAULT_DEVICE_ID)
+            pong_waiter = await self.esp32_connection.ping()
+            task = asyncio.ensure_future(
+                self._record_rtt(device_id, pong_waiter, time.perf_counter())
+            )
+            self.rtt_tasks.add(task)
+            task.add_done_callback(self.rtt_tasks.discard)
         except Exception as e:
             logger.error(f"Error enviando a ESP32: {e}")
             self.esp32_connection = None
+    
+    async def _record_rtt(self, device_id: str, pong_waiter: asyncio.Future, sent_at: float):
+        """
+        Registra el tiempo de ida y vuelta de un comando a la ESP32
+        
+        Args:
+            device_id: Dispositivo que recibió el comando
+            pong_waiter: Future que se resuelve al recibir el pong
+            sent_at: Instante de envío (time.perf_counter)
+        """
+        try:
+            await asyncio.wait_for(pong_waiter, TELEMETRY_PING_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning(f"⏱️  ESP32 no respondió el ping en {TELEMETRY_PING_TIMEOUT}s")
+            return
+        except websockets.exceptions.ConnectionClosed:
+            return
+        
+        rtt_ms = (time.perf_counter() - sent_at) * 1000
+        telemetry_store.record(device_id, 'rtt_ms', rtt_ms)
+        logger.debug(f"RTT ESP32: {rtt_ms:.1f} ms")
+
+# ==================== REINICIO SIN CAÍDA ====================
+
+class RestartManager:
+    """
+    Coordina el drenado del servidor y la entrega del estado a un nuevo proceso
+    
+    Flujo:
+        1. SIGUSR1: se rechazan nuevas partidas y se espera al sucesor
+           (`python server.py --takeover`) en HANDOFF_SOCKET.
+           SIGTERM: el snapshot va directo a HANDOFF_FILE, sin esperar.
+        2. Al conectarse el sucesor se le entrega el socket de escucha y el
+           snapshot del juego. Sin sucesor el snapshot va a HANDOFF_FILE.
+        3. Cada cliente recibe `server_restarting` y se cierra su conexión
+           tras un retraso con jitter para escalonar las reconexiones.
+    """
+    
+    def __init__(self):
+        """Inicializa el gestor sin drenado activo"""
+        self.draining = False
+        self.frozen = False
+        self.ws_server = None
+        self.stopped: Optional[asyncio.Future] = None
+        self.drain_task: Optional[asyncio.Task] = None
+    
+    def attach(self, ws_server):
+        """
+        Asocia el servidor WebSocket en ejecución
+        
+        Args:
+            ws_server: Servidor devuelto por websockets.serve
+        """
+        self.ws_server = ws_server
+        self.stopped = asyncio.get_running_loop().create_future()
+    
+    def begin_drain(self, handoff: bool = True):
+        """
+        Entra en modo drenado (idempotente)
+        
+        Args:
+            handoff: True para esperar a un proceso sucesor, False para
+                guardar el snapshot en HANDOFF_FILE de inmediato
+        """
+        if self.draining:
+            return
+        
+        self.draining = True
+        logger.warning("🚧 Modo drenado: no se aceptan nuevas partidas")
+        self.drain_task = asyncio.ensure_future(self._drain(handoff))
+        self.drain_task.add_done_callback(self._drain_done)
+    
+    def _drain_done(self, task: asyncio.Task):
+        """
+        Propaga el resultado del drenado a `stopped`
+        
+        Args:
+            task: Tarea de drenado terminada
+        """
+        if self.stopped.done():
+            return
+        
+        if task.cancelled():
+            self.stopped.cancel()
+        elif task.exception():
+            logger.error(f"❌ Error durante el drenado: {task.exception()}", exc_info=task.exception())
+            self.stopped.set_exception(task.exception())
+        else:
+            self.stopped.set_result(None)
+    
+    async def _drain(self, handoff: bool):
+        """
+        Entrega el estado y libera a los clientes
+        
+        Args:
+            handoff: True para esperar a un proceso sucesor
+        """
+        successor = await self._wait_for_successor() if handoff else None
+        
+        # A partir de aquí el estado ya no cambia en este proceso
+        self.frozen = True
+        snapshot = game_state.to_snapshot()
+        
+        if successor:
+            try:
+                self._send_handoff(successor, snapshot)
+            except OSError as e:
+                logger.error(f"❌ Falló la entrega al sucesor: {e}")
+                successor = None
+        
+        if not successor:
+            write_handoff_file(snapshot)
+        
+        # Dejar de escuchar; el sucesor conserva su copia del socket
+        self.ws_server.server.close()
+        
+        await self._release_clients()
+        logger.info("✅ Drenado completo")
+    
+    async def _wait_for_successor(self) -> Optional[socket.socket]:
+        """
+        Espera a que un proceso sucesor se conecte a HANDOFF_SOCKET
+        
+        Returns:
+            Conexión con el sucesor o None si no llegó a tiempo
+        """
+        if not hasattr(socket, 'AF_UNIX'):
+            logger.warning("Sockets Unix no disponibles, se usará el archivo de entrega")
+            return None
+        
+        remove_file(HANDOFF_SOCKET)
+        
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            listener.bind(HANDOFF_SOCKET)
+            listener.listen(1)
+        except OSError as e:
+            logger.error(f"❌ No se pudo abrir {HANDOFF_SOCKET}: {e}")
+            listener.close()
+            return None
+        listener.setblocking(False)
+        logger.info(f"Esperando proceso sucesor en {HANDOFF_SOCKET} ({HANDOFF_TIMEOUT}s)")
+        
+        try:
+            loop = asyncio.get_running_loop()
+            successor, _ = await asyncio.wait_for(
+                loop.sock_accept(listener), HANDOFF_TIMEOUT
+            )
+            logger.info("🤝 Proceso sucesor conectado")
+            return successor
+        except asyncio.TimeoutError:
+            logger.warning("⚠️  Ningún sucesor se conectó a tiempo")
+            return None
+        finally:
+            listener.close()
+            remove_file(HANDOFF_SOCKET)
+    
+    def _send_handoff(self, successor: socket.socket, snapshot: Dict):
+        """
+        Envía el socket de escucha y el snapshot al sucesor
+        
+        Args:
+            successor: Conexión Unix con el proceso sucesor
+            snapshot: Estado del juego serializable
+        """
+        fds = array('i', [self.ws_server.sockets[0].fileno()])
+        
+        successor.setblocking(True)
+        with successor:
+            # El primer byte lleva el descriptor del listener (SCM_RIGHTS)
+            successor.sendmsg([b'H'], [(socket.SOL_SOCKET, socket.SCM_RIGHTS, fds)])
+            successor.sendall(json.dumps(snapshot).encode())
+        
+        logger.info("📦 Listener y estado entregados al sucesor")
+    
+    async def _release_clients(self):
+        """Avisa a cada cliente y lo desconecta tras un retraso con jitter"""
+        connections = list(connection_manager.active_connections)
+        logger.info(f"Liberando {len(connections)} conexiones")
+        
+        await asyncio.gather(
+            *(self._release(connection) for connection in connections),
+            return_exceptions=True
+        )
+    
+    async def _release(self, connection):
+        """
+        Envía el aviso de reconexión y cierra una conexión
+        
+        Args:
+            connection: Conexión WebSocket a liberar
+        """
+        delay_ms = RECONNECT_BASE_MS + random.randint(0, RECONNECT_JITTER_MS)
+        
+        try:
+            await connection.send(json.dumps({
+                'event': 'server_restarting',
+                'data': {'reconnect_in_ms': delay_ms},
+                'timestamp': datetime.now().isoformat()
+            }))
+        except websockets.exceptions.ConnectionClosed:
+            return
+        
+        await asyncio.sleep(delay_ms / 1000)
+        # 1012: Service Restart (RFC 6455 / IANA)
+        await connection.close(code=1012, reason='Reinicio del servidor')
+
+def write_handoff_file(snapshot: Dict):
+    """
+    Guarda el snapshot de forma atómica en HANDOFF_FILE
+    
+    Args:
+        snapshot: Estado del juego serializable
+    """
+    tmp_path = f"{HANDOFF_FILE}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(snapshot, f)
+    os.replace(tmp_path, HANDOFF_FILE)
+    
+    logger.info(f"💾 Estado guardado en {HANDOFF_FILE}")
+
+def remove_file(path: str):
+    """
+    Elimina un archivo si existe
+    
+    Args:
+        path: Ruta del archivo
+    """
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def load_handoff_file() -> Optional[Dict]:
+    """
+    Lee y elimina el snapshot dejado por un proceso anterior
+    
+    Los snapshots con más de HANDOFF_MAX_AGE segundos o corruptos se
+    ignoran (y se dejan en disco para revisarlos).
+    
+    Returns:
+        Snapshot del juego o None si no hay uno válido
+    """
+    try:
+        age = time.time() - os.path.getmtime(HANDOFF_FILE)
+    except FileNotFoundError:
+        return None
+    
+    if age > HANDOFF_MAX_AGE:
+        logger.warning(f"⚠️  {HANDOFF_FILE} tiene {age:.0f}s, no se restaura (máximo {HANDOFF_MAX_AGE}s)")
+        return None
+    
+    try:
+        with open(HANDOFF_FILE) as f:
+            snapshot = json.load(f)
+    except ValueError as e:  # JSONDecodeError y UnicodeDecodeError
+        logger.warning(f"⚠️  {HANDOFF_FILE} corrupto, no se restaura: {e}")
+        return None
+    os.remove(HANDOFF_FILE)
+    
+    logger.info(f"📂 Estado leído de {HANDOFF_FILE}")
+    return snapshot
+
+async def receive_handoff() -> Tuple[Optional[socket.socket], Optional[Dict]]:
+    """
+    Toma el socket de escucha y el estado de un proceso en drenado
+    
+    Returns:
+        (socket de escucha heredado, snapshot); cualquiera puede ser None si
+        la entrega falló y hay que escuchar de forma normal
+    """
+    deadline = time.monotonic() + HANDOFF_TIMEOUT
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    
+    # El proceso anterior abre HANDOFF_SOCKET al recibir la señal de drenado
+    while True:
+        try:
+            conn.connect(HANDOFF_SOCKET)
+            break
+        except (FileNotFoundError, ConnectionRefusedError):
+            if time.monotonic() > deadline:
+                logger.error("No se encontró un proceso en drenado para tomar el relevo")
+                conn.close()
+                return None, None
+            await asyncio.sleep(0.2)
+    
+    with conn:
+        fd_size = array('i').itemsize
+        _, ancdata, _, _ = conn.recvmsg(1, socket.CMSG_SPACE(fd_size))
+        fds = array('i')
+        for level, kind, data in ancdata:
+            if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+                fds.frombytes(data[:len(data) - (len(data) % fd_size)])
+        
+        chunks = []
+        while True:
+            chunk = conn.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    
+    try:
+        snapshot = json.loads(b''.join(chunks)) if chunks else None
+    except ValueError as e:
+        logger.warning(f"⚠️  Snapshot recibido inválido, se inicia sin partida: {e}")
+        snapshot = None
+    
+    if not fds:
+        logger.error("El proceso anterior no entregó el socket de escucha, se abrirá uno nuevo")
+        return None, snapshot
+    
+    listener = socket.socket(fileno=fds[0])
+    logger.info(f"🤝 Listener heredado: {listener.getsockname()}")
+    return listener, snapshot
 
 # ==================== INSTANCIAS GLOBALES ====================
 
 game_state = GameState()
 connection_manager = ConnectionManager()
+restart_manager = RestartManager()
+telemetry_store = TelemetryStore()
+timer_wheel = TimerWheel()
+
+# Llaves de los temporizadores de la partida
+TURN_TIMER = ('turn', 'game')
+IDLE_TIMER = ('idle', 'game')
+
+# ==================== TIMEOUTS DE LA PARTIDA ====================
+
+def parse_timeout(value, default: float) -> float:
+    """
+    Valida un timeout recibido de un cliente
+    
+    Args:
+        value: Valor recibido (None usa el valor por defecto)
+        default: Valor por defecto en segundos
+        
+    Returns:
+        Segundos (0 = sin límite)
+        
+    Raises:
+        ValueError: Si no es un número no negativo
+    """
+    if value is None:
+        return default
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not 0 <= value < float('inf'):
+        raise ValueError(f"Timeout inválido: {value!r} (se espera un número >= 0)")
+    return value
+
+def schedule_turn_timer():
+    """(Re)programa el timeout del turno actual"""
+    if game_state.game_started and not game_state.winner and game_state.turn_timeout:
+        timer_wheel.schedule(TURN_TIMER, game_state.turn_timeout, on_turn_timeout)
+
+def touch_game():
+    """Reinicia el timeout de inactividad (solo por actividad de jugadores)"""
+    if game_state.game_started and game_state.idle_timeout:
+        timer_wheel.schedule(IDLE_TIMER, game_state.idle_timeout, on_idle_timeout)
+
+def schedule_game_timers():
+    """Programa los timeouts de turno e inactividad de la partida"""
+    if not game_state.game_started or game_state.winner:
+        return
+    
+    schedule_turn_timer()
+    touch_game()
+
+def cancel_game_timers():
+    """Cancela los timeouts de la partida"""
+    timer_wheel.cancel(TURN_TIMER)
+    timer_wheel.cancel(IDLE_TIMER)
+
+async def on_turn_timeout():
+    """Pasa el turno cuando el jugador actual no lo terminó a tiempo"""
+    if restart_manager.frozen or not game_state.game_started or game_state.winner:
+        return
+    
+    logger.warning(f"⌛ Turno del jugador {game_state.current_player} expirado")
+    await advance_turn('timeout')
+
+async def on_idle_timeout():
+    """Cierra la partida tras ROOM_IDLE_TIMEOUT sin actividad"""
+    if restart_manager.frozen or not game_state.game_started:
+        return
+    
+    logger.warning("💤 Partida cerrada por inactividad")
+    cancel_game_timers()
+    game_state.__init__()
+    
+    await connection_manager.broadcast({
+        'event': 'game_closed',
+        'data': {'reason': 'idle'},
+        'timestamp': datetime.now().isoformat()
+    })
+
+async def advance_turn(reason: str):
+    """
+    Pasa al siguiente jugador y notifica a clientes y ESP32
+    
+    Args:
+        reason: 'end_turn' o 'timeout'
+    """
+    next_player = game_state.next_turn()
+    # Un turno pasado por timeout no cuenta como actividad
+    schedule_turn_timer()
+    
+    logger.info(f"Nuevo turno: Jugador {next_player} ({reason})")
+    
+    # Notificar cambio de turno
+    await connection_manager.broadcast({
+        'event': 'turn_changed',
+        'data': {
+            'current_player': next_player,
+            'turn_number': game_state.turn_number,
+            'reason': reason
+        },
+        'timestamp': datetime.now().isoformat()
+    })
+    
+    # Resaltar jugador en ESP32
+    await connection_manager.send_to_esp32({
+        'command': 'highlight_player',
+        'player_id': next_player,
+        'color': game_state.players[next_player]['color']
+    })
 
 # ==================== MANEJADORES DE EVENTOS ====================
 
-async def handle_start_game(data: Dict):
+async def handle_start_game(data: Dict, websocket=None):
     """
     Inicia una nueva partida
     
     Args:
-        data: {players: [{id, name, color}], board_size: int}
+        data: {players: [{id, name, color}], board_size: int,
+               turn_timeout: int, idle_timeout: int (segundos, 0 = sin límite)}
+        websocket: Conexión que la solicitó (para reportar errores)
     
     DUMMY DATA GENERATOR:
     data = {
@@ -302,6 +1447,17 @@ async def handle_start_game(data: Dict):
         'board_size': 100
     }
     """
+    # Validar antes de tocar el estado
+    try:
+        turn_timeout = parse_timeout(data.get('turn_timeout'), TURN_TIMEOUT)
+        idle_timeout = parse_timeout(data.get('idle_timeout'), ROOM_IDLE_TIMEOUT)
+    except ValueError as e:
+        if websocket is not None:
+            await send_error(websocket, str(e))
+        else:
+            logger.warning(str(e))
+        return
+    
     logger.info("=" * 50)
     logger.info("INICIANDO NUEVA PARTIDA")
     logger.info("=" * 50)
@@ -319,6 +1475,11 @@ async def handle_start_game(data: Dict):
     
     game_state.game_started = True
     game_state.board_size = data.get('board_size', 100)
+    game_state.turn_timeout = turn_timeout
+    game_state.idle_timeout = idle_timeout
+    
+    cancel_game_timers()
+    schedule_game_timers()
     
     logger.info(f"Partida iniciada con {len(game_state.players)} jugadores")
     
@@ -358,6 +1519,9 @@ async def handle_dice_rolled(data: Dict):
     # Mover jugador
     move_result = game_state.move_player(player_id, dice_value)
     
+    # Actividad en la partida: reiniciar el timeout de inactividad
+    touch_game()
+    
     # Broadcast del movimiento
     await connection_manager.broadcast({
         'event': 'player_moved',
@@ -376,6 +1540,7 @@ async def handle_dice_rolled(data: Dict):
     # Verificar victoria
     if game_state.winner:
         logger.info(f"🏆 JUEGO TERMINADO - Ganador: {player_id}")
+        timer_wheel.cancel(TURN_TIMER)
         await connection_manager.broadcast({
             'event': 'player_won',
             'data': {
@@ -405,26 +1570,8 @@ async def handle_end_turn(data: Dict):
         return
     
     # Cambiar turno
-    next_player = game_state.next_turn()
-    
-    logger.info(f"Nuevo turno: Jugador {next_player}")
-    
-    # Notificar cambio de turno
-    await connection_manager.broadcast({
-        'event': 'turn_changed',
-        'data': {
-            'current_player': next_player,
-            'turn_number': game_state.turn_number
-        },
-        'timestamp': datetime.now().isoformat()
-    })
-    
-    # Resaltar jugador en ESP32
-    await connection_manager.send_to_esp32({
-        'command': 'highlight_player',
-        'player_id': next_player,
-        'color': game_state.players[next_player]['color']
-    })
+    touch_game()
+    await advance_turn('end_turn')
 
 async def handle_button_pressed(data: Dict):
     """
@@ -454,12 +1601,13 @@ async def handle_button_pressed(data: Dict):
             'value': dice_value
         })
 
-async def handle_esp32_status(data: Dict):
+async def handle_esp32_status(data: Dict, websocket=None):
     """
     Recibe el estado de la ESP32
     
     Args:
-        data: {wifi_strength: int, errors: []}
+        data: {wifi_strength: int, errors: [], device_id: str (opcional)}
+        websocket: Conexión de la ESP32 (para asociar su device_id)
     
     DUMMY DATA GENERATOR:
     data = {
@@ -469,8 +1617,19 @@ async def handle_esp32_status(data: Dict):
     """
     logger.debug(f"📊 Estado ESP32: WiFi {data.get('wifi_strength')} dBm")
     
-    if data.get('errors'):
-        logger.warning(f"Errores en ESP32: {data.get('errors')}")
+    device_id = data.get('device_id', DEFAULT_DEVICE_ID)
+    errors = data.get('errors') or []
+    
+    # El RTT de los comandos se guarda en la misma serie del dispositivo
+    if websocket is not None:
+        connection_manager.device_ids[websocket] = device_id
+    
+    if data.get('wifi_strength') is not None:
+        telemetry_store.record(device_id, 'wifi_strength', data['wifi_strength'])
+    telemetry_store.record(device_id, 'errors', len(errors))
+    
+    if errors:
+        logger.warning(f"Errores en ESP32: {errors}")
 
 async def handle_get_state(websocket):
     """
@@ -487,6 +1646,84 @@ async def handle_get_state(websocket):
         'timestamp': datetime.now().isoformat()
     }))
 
+async def handle_get_metrics(websocket):
+    """
+    Envía las métricas del servidor a un cliente
+    
+    Args:
+        websocket: Conexión del cliente
+    """
+    logger.debug("Enviando métricas a cliente")
+    
+    await websocket.send(json.dumps({
+        'event': 'metrics',
+        'data': {
+            'compression': compression_stats.get_stats()
+        },
+        'timestamp': datetime.now().isoformat()
+    }))
+
+async def handle_get_telemetry(websocket, data: Dict):
+    """
+    Envía un rango de telemetría de un dispositivo a un cliente
+    
+    Args:
+        websocket: Conexión del cliente
+        data: {device_id: str, metrics: [str], start: float, end: float,
+               resolution: 'raw' | '1m' | '1h'} (todos opcionales)
+    
+    DUMMY DATA GENERATOR:
+    data = {
+        'device_id': 'esp32',
+        'metrics': ['wifi_strength', 'rtt_ms'],
+        'start': time.time() - 3600
+    }
+    """
+    device_id = data.get('device_id', DEFAULT_DEVICE_ID)
+    end = data.get('end', time.time())
+    start = data.get('start', end - 3600)
+    
+    logger.debug(f"Consultando telemetría de {device_id}: {start} - {end}")
+    
+    try:
+        series = {
+            metric: telemetry_store.query(device_id, metric, start, end, data.get('resolution'))
+            for metric in data.get('metrics', TELEMETRY_METRICS)
+        }
+    except KeyError as e:
+        await send_error(websocket, f"Telemetría no encontrada: {e}")
+        return
+    except ValueError as e:
+        await send_error(websocket, str(e))
+        return
+    
+    await websocket.send(json.dumps({
+        'event': 'telemetry',
+        'data': {
+            'device_id': device_id,
+            'start': start,
+            'end': end,
+            'series': series
+        },
+        'timestamp': datetime.now().isoformat()
+    }))
+
+async def send_error(websocket, message: str):
+    """
+    Envía un mensaje de error a un cliente
+    
+    Args:
+        websocket: Conexión del cliente
+        message: Descripción del error
+    """
+    logger.warning(f"Error enviado a cliente: {message}")
+    
+    await websocket.send(json.dumps({
+        'event': 'error',
+        'data': {'message': message},
+        'timestamp': datetime.now().isoformat()
+    }))
+
 # ==================== ROUTER DE EVENTOS ====================
 
 EVENT_HANDLERS = {
@@ -495,7 +1732,9 @@ EVENT_HANDLERS = {
     'end_turn': handle_end_turn,
     'button_pressed': handle_button_pressed,
     'esp32_status': handle_esp32_status,
-    'get_state': lambda data: handle_get_state(data)
+    'get_state': lambda data: handle_get_state(data),
+    'get_metrics': lambda data: handle_get_metrics(data),
+    'get_telemetry': handle_get_telemetry
 }
 
 async def route_message(message: Dict, websocket):
@@ -512,9 +1751,26 @@ async def route_message(message: Dict, websocket):
     logger.info(f"📨 Evento recibido: {event}")
     logger.debug(f"Datos: {data}")
     
+    # El estado ya fue entregado al sucesor: solo se permiten consultas
+    if restart_manager.frozen and event not in ('get_state', 'get_metrics', 'get_telemetry'):
+        await send_error(websocket, f"Servidor reiniciando, evento ignorado: {event}")
+        return
+    
+    if restart_manager.draining and event == 'start_game':
+        await send_error(websocket, "Servidor en drenado, no se aceptan nuevas partidas")
+        return
+    
     if event in EVENT_HANDLERS:
         if event == 'get_state':
             await handle_get_state(websocket)
+        elif event == 'get_metrics':
+            await handle_get_metrics(websocket)
+        elif event == 'get_telemetry':
+            await handle_get_telemetry(websocket, data)
+        elif event == 'esp32_status':
+            await handle_esp32_status(data, websocket)
+        elif event == 'start_game':
+            await handle_start_game(data, websocket)
         else:
             await EVENT_HANDLERS[event](data)
     else:
@@ -562,6 +1818,24 @@ async def handle_client(websocket, path):
     finally:
         connection_manager.disconnect(websocket)
 
+def restore_game(snapshot: Dict):
+    """
+    Restaura la partida de un proceso anterior
+    
+    Un snapshot con forma inválida se descarta y se inicia sin partida.
+    
+    Args:
+        snapshot: Estado leído del archivo o del proceso anterior
+    """
+    try:
+        game_state.restore(snapshot)
+    except (KeyError, TypeError, ValueError, AttributeError) as e:
+        logger.warning(f"⚠️  Snapshot inválido, se inicia sin partida: {e!r}")
+        game_state.__init__()
+        return
+    
+    schedule_game_timers()
+
 async def main():
     """Función principal que inicia el servidor"""
     logger.info("=" * 60)
@@ -572,10 +1846,46 @@ async def main():
     logger.info(f"Timestamp: {datetime.now().isoformat()}")
     logger.info("=" * 60)
     
-    async with websockets.serve(handle_client, HOST, PORT):
+    # Recuperar estado de un proceso anterior
+    listener = None
+    if '--takeover' in sys.argv:
+        listener, snapshot = await receive_handoff()
+    else:
+        snapshot = load_handoff_file()
+    
+    if snapshot:
+        restore_game(snapshot)
+    
+    if listener:
+        address = {'sock': listener}
+    else:
+        address = {'host': HOST, 'port': PORT}
+    
+    async with websockets.serve(
+        handle_client,
+        create_protocol=GameServerProtocol,
+        extensions=[build_browser_compression()],
+        **address
+    ) as ws_server:
+        restart_manager.attach(ws_server)
+        wheel_task = asyncio.create_task(timer_wheel.run())
+        
+        # Señales de reinicio (no disponibles en Windows):
+        # SIGUSR1 entrega el listener a un sucesor, SIGTERM guarda el
+        # snapshot de inmediato (Docker manda SIGKILL a los 10 s)
+        loop = asyncio.get_running_loop()
+        for sig_name, handoff in (('SIGUSR1', True), ('SIGTERM', False)):
+            try:
+                loop.add_signal_handler(
+                    getattr(signal, sig_name), restart_manager.begin_drain, handoff
+                )
+            except (AttributeError, NotImplementedError):
+                logger.debug(f"Señal {sig_name} no disponible")
+        
         logger.info(f"✅ Servidor escuchando en ws://{HOST}:{PORT}")
         logger.info("Esperando conexiones...")
-        await asyncio.Future()  # Run forever
+        await restart_manager.stopped  # Hasta que termine un drenado
+        wheel_task.cancel()
 
 if __name__ == "__main__":
     try:
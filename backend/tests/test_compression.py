@@ -0,0 +1,125 @@
+"""
+Pruebas de la política de compresión por tipo de cliente y tamaño de mensaje
+"""
+
+import json
+import unittest
+import zlib
+
+import websockets
+from websockets.extensions.permessage_deflate import PerMessageDeflate
+from websockets.frames import OP_TEXT, Frame
+
+import server
+from server import CompressionStats, SelectivePerMessageDeflate
+
+def make_extension() -> SelectivePerMessageDeflate:
+    """Extensión igual a la negociada con un navegador"""
+    return SelectivePerMessageDeflate(
+        True, True,
+        server.COMPRESSION_WINDOW_BITS, server.COMPRESSION_WINDOW_BITS,
+        {'memLevel': server.COMPRESSION_MEM_LEVEL, 'level': server.COMPRESSION_LEVEL}
+    )
+
+def make_snapshot(size: int) -> bytes:
+    """Mensaje JSON de al menos `size` bytes"""
+    players = {}
+    while len(json.dumps(players)) < size:
+        i = len(players) + 1
+        players[i] = {'id': i, 'name': f'Jugador {i}', 'color': '#FF0000', 'position': i}
+    return json.dumps({'event': 'game_state', 'data': {'players': players}}).encode()
+
+class CompressionTestCase(unittest.TestCase):
+    
+    def setUp(self):
+        self.original_stats = server.compression_stats
+        server.compression_stats = CompressionStats()
+        server._compressed_cache.clear()
+    
+    def tearDown(self):
+        server.compression_stats = self.original_stats
+        server._compressed_cache.clear()
+
+class SelectivePerMessageDeflateTest(CompressionTestCase):
+    
+    def test_small_message_is_not_compressed(self):
+        data = b'{"command": "move_piece", "player_id": 1}'
+        self.assertLess(len(data), server.COMPRESSION_MIN_SIZE)
+        
+        frame = make_extension().encode(Frame(OP_TEXT, data))
+        
+        self.assertFalse(frame.rsv1)
+        self.assertEqual(frame.data, data)
+        self.assertEqual(server.compression_stats.messages_uncompressed, 1)
+    
+    def test_shared_payload_is_decodable(self):
+        data = make_snapshot(2000)
+        first = make_extension().encode(Frame(OP_TEXT, data))
+        second = make_extension().encode(Frame(OP_TEXT, data))
+        
+        self.assertTrue(first.rsv1)
+        self.assertEqual(first.data, second.data)
+        self.assertLess(len(first.data), len(data))
+        self.assertEqual(server.compression_stats.cache_hits, 1)
+        
+        # Decodificador del lado del cliente (parámetros espejo)
+        client = PerMessageDeflate(
+            True, True, server.COMPRESSION_WINDOW_BITS, server.COMPRESSION_WINDOW_BITS
+        )
+        self.assertEqual(client.decode(first).data, data)
+        self.assertEqual(client.decode(second).data, data)
+        
+        # Equivalente a un deflate estándar con la misma ventana
+        decoder = zlib.decompressobj(wbits=-server.COMPRESSION_WINDOW_BITS)
+        self.assertEqual(decoder.decompress(first.data + b'\x00\x00\xff\xff'), data)
+
+class NegotiationTest(CompressionTestCase, unittest.IsolatedAsyncioTestCase):
+    
+    async def asyncSetUp(self):
+        self.ws_server = await websockets.serve(
+            server.handle_client,
+            '127.0.0.1',
+            0,
+            create_protocol=server.GameServerProtocol,
+            extensions=[server.build_browser_compression()]
+        )
+        port = self.ws_server.sockets[0].getsockname()[1]
+        self.url = f'ws://127.0.0.1:{port}'
+    
+    async def asyncTearDown(self):
+        self.ws_server.close()
+        await self.ws_server.wait_closed()
+    
+    async def test_browser_negotiates_tuned_deflate(self):
+        async with websockets.connect(self.url) as ws:
+            (extension,) = ws.extensions
+            self.assertEqual(extension.local_max_window_bits, server.COMPRESSION_WINDOW_BITS)
+            self.assertEqual(extension.remote_max_window_bits, server.COMPRESSION_WINDOW_BITS)
+            self.assertTrue(extension.local_no_context_takeover)
+            self.assertTrue(extension.remote_no_context_takeover)
+    
+    async def test_device_gets_no_extensions(self):
+        async with websockets.connect(self.url, user_agent_header='ESP32-Arduino') as ws:
+            self.assertEqual(ws.extensions, [])
+            await ws.recv()  # Estado inicial
+        
+        self.assertEqual(server.compression_stats.device_messages, 1)
+    
+    async def test_broadcast_is_compressed_once(self):
+        message = json.loads(make_snapshot(2088))
+        
+        async with websockets.connect(self.url) as a, websockets.connect(self.url) as b:
+            await a.recv()
+            await b.recv()
+            await server.connection_manager.broadcast(message)
+            
+            self.assertEqual(json.loads(await a.recv()), message)
+            self.assertEqual(json.loads(await b.recv()), message)
+        
+        stats = server.compression_stats.get_stats()
+        self.assertEqual(stats['messages_compressed'], 2)
+        self.assertEqual(stats['cache_hits'], 1)
+        self.assertLess(stats['compression_ratio'], 1.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,190 @@
+"""
+Pruebas del drenado y la entrega de estado entre procesos
+"""
+
+import asyncio
+import json
+import os
+import socket
+import tempfile
+import time
+import unittest
+
+import server
+from server import GameState, RestartManager
+
+class FakeWebSocket:
+    """Conexión falsa que guarda los mensajes enviados"""
+    
+    def __init__(self):
+        self.sent = []
+    
+    async def send(self, message: str):
+        self.sent.append(json.loads(message))
+
+class SnapshotTest(unittest.TestCase):
+    
+    def test_round_trip_restores_int_keys(self):
+        state = GameState()
+        state.add_player(1, 'Ana', '#FF0000')
+        state.add_player(2, 'Luis', '#0000FF')
+        state.game_started = True
+        state.move_player(1, 4)
+        state.next_turn()
+        
+        restored = GameState()
+        restored.restore(json.loads(json.dumps(state.to_snapshot())))
+        
+        self.assertEqual(restored.players, state.players)
+        self.assertEqual(set(restored.players), {1, 2})
+        self.assertEqual(restored.snakes, state.snakes)
+        self.assertEqual(restored.ladders, state.ladders)
+        self.assertEqual(restored.current_player, 2)
+        # El estado restaurado sigue funcionando con llaves enteras
+        self.assertEqual(restored.next_turn(), 1)
+
+class DrainTest(unittest.TestCase):
+    
+    def tearDown(self):
+        server.restart_manager = RestartManager()
+        server.game_state.__init__()
+    
+    def test_drain_rejects_new_games(self):
+        server.restart_manager.draining = True
+        websocket = FakeWebSocket()
+        
+        asyncio.run(server.route_message({
+            'event': 'start_game',
+            'data': {'players': [{'id': 1, 'name': 'Ana', 'color': '#FF0000'}]}
+        }, websocket))
+        
+        self.assertFalse(server.game_state.game_started)
+        self.assertEqual([m['event'] for m in websocket.sent], ['error'])
+    
+    def test_frozen_replies_to_ignored_events(self):
+        server.restart_manager.draining = True
+        server.restart_manager.frozen = True
+        websocket = FakeWebSocket()
+        
+        asyncio.run(server.route_message({'event': 'end_turn', 'data': {'player_id': 1}}, websocket))
+        asyncio.run(server.route_message({'event': 'get_state', 'data': {}}, websocket))
+        
+        self.assertEqual([m['event'] for m in websocket.sent], ['error', 'game_state'])
+    
+class FakeServer:
+    """Servidor WebSocket falso con un listener real"""
+    
+    def __init__(self):
+        self.listener = socket.socket()
+        self.sockets = [self.listener]
+        self.server = self
+        self.closed = False
+    
+    def close(self):
+        self.closed = True
+        self.listener.close()
+
+class DrainFallbackTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.originals = (server.HANDOFF_FILE, server.HANDOFF_SOCKET, server.restart_manager)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        server.HANDOFF_FILE = os.path.join(self.tmpdir.name, 'handoff.json')
+        server.game_state.add_player(1, 'Ana', '#FF0000')
+    
+    def tearDown(self):
+        server.HANDOFF_FILE, server.HANDOFF_SOCKET, server.restart_manager = self.originals
+        server.game_state.__init__()
+        self.tmpdir.cleanup()
+    
+    def drain(self, manager: RestartManager):
+        async def scenario():
+            manager.attach(FakeServer())
+            server.restart_manager = manager
+            manager.begin_drain()
+            await manager.stopped
+            return manager.ws_server
+        
+        return asyncio.run(scenario())
+    
+    def test_handoff_socket_failure_writes_file(self):
+        server.HANDOFF_SOCKET = '/ruta/inexistente/handoff.sock'
+        
+        ws_server = self.drain(RestartManager())
+        
+        self.assertTrue(ws_server.closed)
+        with open(server.HANDOFF_FILE) as f:
+            self.assertIn('1', json.load(f)['players'])
+    
+    def test_dead_successor_writes_file(self):
+        class DeadSuccessorManager(RestartManager):
+            async def _wait_for_successor(self):
+                successor, peer = socket.socketpair()
+                peer.close()  # El sucesor murió antes de recibir
+                return successor
+        
+        ws_server = self.drain(DeadSuccessorManager())
+        
+        self.assertTrue(ws_server.closed)
+        self.assertTrue(os.path.exists(server.HANDOFF_FILE))
+
+class HandoffFileTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.original = server.HANDOFF_FILE
+        self.tmpdir = tempfile.TemporaryDirectory()
+        server.HANDOFF_FILE = os.path.join(self.tmpdir.name, 'handoff.json')
+    
+    def tearDown(self):
+        server.HANDOFF_FILE = self.original
+        self.tmpdir.cleanup()
+    
+    def test_fresh_file_is_restored_once(self):
+        server.write_handoff_file(GameState().to_snapshot())
+        
+        self.assertIsNotNone(server.load_handoff_file())
+        self.assertFalse(os.path.exists(server.HANDOFF_FILE))
+        self.assertIsNone(server.load_handoff_file())
+    
+    def test_stale_file_is_ignored(self):
+        server.write_handoff_file(GameState().to_snapshot())
+        old = time.time() - server.HANDOFF_MAX_AGE - 60
+        os.utime(server.HANDOFF_FILE, (old, old))
+        
+        self.assertIsNone(server.load_handoff_file())
+        self.assertTrue(os.path.exists(server.HANDOFF_FILE))
+    
+    def test_corrupt_file_is_ignored(self):
+        with open(server.HANDOFF_FILE, 'w') as f:
+            f.write('{"players": ')
+        
+        self.assertIsNone(server.load_handoff_file())
+    
+    def test_undecodable_file_is_ignored(self):
+        with open(server.HANDOFF_FILE, 'wb') as f:
+            f.write(b'\xff\xfe\x00')
+        
+        self.assertIsNone(server.load_handoff_file())
+
+class RestoreGameTest(unittest.TestCase):
+    
+    def tearDown(self):
+        server.game_state.__init__()
+    
+    def test_invalid_snapshots_start_empty(self):
+        valid = GameState()
+        valid.add_player(1, 'Ana', '#FF0000')
+        snapshot = json.loads(json.dumps(valid.to_snapshot()))
+        
+        bad_players = dict(snapshot, players={'uno': snapshot['players']['1']})
+        incomplete = dict(snapshot, players={'1': {'id': 1}})
+        
+        for bad in ({}, [], bad_players, incomplete, dict(snapshot, current_player=7)):
+            server.restore_game(bad)
+            self.assertEqual(server.game_state.players, {})
+        
+        server.restore_game(snapshot)
+        self.assertEqual(set(server.game_state.players), {1})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+"""
+Pruebas del almacén de telemetría (buffers circulares y downsampling)
+"""
+
+import asyncio
+import json
+import unittest
+
+import server
+from server import RingBuffer, TelemetryStore, TimeSeries
+
+class FakeWebSocket:
+    """Conexión falsa que guarda los mensajes enviados"""
+    
+    def __init__(self):
+        self.sent = []
+    
+    async def send(self, message: str):
+        self.sent.append(json.loads(message))
+    
+    async def ping(self) -> asyncio.Future:
+        pong_waiter = asyncio.get_running_loop().create_future()
+        pong_waiter.set_result(None)
+        return pong_waiter
+
+class RingBufferTest(unittest.TestCase):
+    
+    def test_overwrites_oldest_entries(self):
+        buffer = RingBuffer(4)
+        for ts in range(10):
+            buffer.append(ts, ts, ts, ts)
+        
+        self.assertEqual(buffer.count, 4)
+        self.assertEqual(buffer.oldest(), 6)
+        self.assertEqual([p[0] for p in buffer.query(0, 100)], [6, 7, 8, 9])
+    
+    def test_query_range_is_inclusive(self):
+        buffer = RingBuffer(8)
+        for ts in range(8):
+            buffer.append(ts, ts, ts, ts)
+        
+        self.assertEqual([p[0] for p in buffer.query(2, 5)], [2, 3, 4, 5])
+        self.assertEqual(buffer.query(20, 30), [])
+
+class TimeSeriesTest(unittest.TestCase):
+    
+    def test_memory_stays_bounded(self):
+        series = TimeSeries()
+        # Una semana y media de muestras cada 10 segundos
+        for i in range(10 * 24 * 360):
+            series.add(i * 10.0, -50.0)
+        
+        self.assertEqual(series.raw.count, server.TELEMETRY_RAW_SIZE)
+        self.assertEqual(len(series.raw.timestamps), server.TELEMETRY_RAW_SIZE)
+        self.assertEqual(len(series.tiers['1m'].timestamps), server.TELEMETRY_MINUTE_SIZE)
+        self.assertEqual(series.tiers['1h'].count, server.TELEMETRY_HOUR_SIZE)
+    
+    def test_minute_buckets_aggregate_samples(self):
+        series = TimeSeries()
+        for i, value in enumerate([10, 20, 30, 40, 50, 60, 70]):
+            series.add(i * 10.0, value)
+        
+        result = series.query(0, 60, '1m')
+        self.assertEqual(result['resolution'], '1m')
+        # Bucket cerrado [0, 60) y bucket en curso [60, 120)
+        self.assertEqual(result['points'], [[0.0, 35.0, 10.0, 60.0], [60.0, 70.0, 70.0, 70.0]])
+    
+    def test_picks_tier_covering_range(self):
+        series = TimeSeries()
+        end = 3 * 24 * 3600
+        for ts in range(0, end, 10):
+            series.add(float(ts), 1.0)
+        
+        raw_start = end - 10 * server.TELEMETRY_RAW_SIZE
+        self.assertEqual(series.query(raw_start, end)['resolution'], 'raw')
+        self.assertEqual(series.query(end - 3600 * 12, end)['resolution'], '1m')
+        self.assertEqual(series.query(0, end)['resolution'], '1h')
+    
+    def test_clock_going_backwards_is_clamped(self):
+        series = TimeSeries()
+        series.add(130.0, 1.0)
+        series.add(50.0, 2.0)  # Ajuste de NTP hacia atrás
+        series.add(140.0, 3.0)
+        
+        self.assertEqual([p[0] for p in series.raw.query(0, 200)], [130.0, 130.0, 140.0])
+        self.assertEqual(series.tiers['1m'].count, 0)
+        self.assertEqual(series.query(0, 200, '1m')['points'], [[120.0, 2.0, 1.0, 3.0]])
+    
+    def test_unknown_resolution(self):
+        with self.assertRaises(ValueError):
+            TimeSeries().query(0, 10, '5m')
+
+class TelemetryStoreTest(unittest.TestCase):
+    
+    def test_evicts_least_recently_updated_device(self):
+        store = TelemetryStore()
+        store.record('esp32', 'rtt_ms', 1.0, timestamp=0.0)
+        for i in range(server.TELEMETRY_MAX_DEVICES + 5):
+            store.record(f'falso{i}', 'rtt_ms', 1.0, timestamp=0.0)
+            # La placa real sigue reportando
+            store.record('esp32', 'rtt_ms', 1.0, timestamp=0.0)
+        
+        self.assertEqual(len(store.devices), server.TELEMETRY_MAX_DEVICES)
+        self.assertIn('esp32', store.devices)
+        self.assertNotIn('falso0', store.devices)
+    
+    def test_rtt_uses_reported_device_id(self):
+        store = TelemetryStore()
+        manager = server.ConnectionManager()
+        esp32 = FakeWebSocket()
+        manager.esp32_connection = esp32
+        
+        async def scenario():
+            await server.handle_esp32_status({'device_id': 'tablero-2', 'wifi_strength': -50}, esp32)
+            await manager.send_to_esp32({'command': 'reset_board'})
+            await asyncio.gather(*manager.rtt_tasks)
+        
+        originals = (server.telemetry_store, server.connection_manager)
+        server.telemetry_store, server.connection_manager = store, manager
+        try:
+            asyncio.run(scenario())
+        finally:
+            server.telemetry_store, server.connection_manager = originals
+        
+        series = store.devices['tablero-2']
+        self.assertEqual(series['wifi_strength'].raw.count, 1)
+        self.assertEqual(series['rtt_ms'].raw.count, 1)
+        self.assertNotIn(server.DEFAULT_DEVICE_ID, store.devices)
+    
+    def test_get_telemetry_event(self):
+        store = TelemetryStore()
+        store.record('esp32', 'wifi_strength', -40, timestamp=100.0)
+        store.record('esp32', 'wifi_strength', -60, timestamp=110.0)
+        
+        websocket = FakeWebSocket()
+        original = server.telemetry_store
+        server.telemetry_store = store
+        try:
+            asyncio.run(server.handle_get_telemetry(websocket, {
+                'metrics': ['wifi_strength'], 'start': 0, 'end': 200, 'resolution': 'raw'
+            }))
+            asyncio.run(server.handle_get_telemetry(websocket, {'device_id': 'otro'}))
+        finally:
+            server.telemetry_store = original
+        
+        response, error = websocket.sent
+        self.assertEqual(response['event'], 'telemetry')
+        self.assertEqual(
+            response['data']['series']['wifi_strength']['points'],
+            [[100.0, -40.0, -40.0, -40.0], [110.0, -60.0, -60.0, -60.0]]
+        )
+        self.assertEqual(error['event'], 'error')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,179 @@
+"""
+Pruebas de la rueda de temporizadores y los timeouts de la partida
+"""
+
+import asyncio
+import json
+import unittest
+
+import server
+from server import TimerWheel
+
+PLAYERS = [
+    {'id': 1, 'name': 'Ana', 'color': '#FF0000'},
+    {'id': 2, 'name': 'Luis', 'color': '#0000FF'}
+]
+
+class FakeWebSocket:
+    """Conexión falsa que guarda los mensajes enviados"""
+    
+    def __init__(self):
+        self.sent = []
+    
+    async def send(self, message: str):
+        self.sent.append(json.loads(message))
+
+async def noop():
+    pass
+
+def advance_until_fired(wheel: TimerWheel, key, limit: int) -> int:
+    """Avanza la rueda hasta que vence `key` y devuelve el tick"""
+    for _ in range(limit):
+        if any(timer.key == key for timer in wheel.advance()):
+            return wheel.current_tick
+    raise AssertionError(f"{key} no venció en {limit} ticks")
+
+class TimerWheelTest(unittest.TestCase):
+    
+    def test_fires_on_exact_tick_across_levels(self):
+        wheel = TimerWheel(slots=8, levels=3)
+        for delay in (1, 7, 8, 9, 63, 64, 200, 511):
+            wheel.schedule(delay, delay, noop)
+        
+        fired = {}
+        for _ in range(600):
+            for timer in wheel.advance():
+                fired[timer.key] = wheel.current_tick
+        
+        self.assertEqual(fired, {d: d for d in (1, 7, 8, 9, 63, 64, 200, 511)})
+        self.assertEqual(wheel.timers, {})
+    
+    def test_beyond_range_is_clamped_then_cascaded(self):
+        wheel = TimerWheel(slots=4, levels=2)
+        wheel.schedule('far', 40, noop)
+        
+        self.assertEqual(advance_until_fired(wheel, 'far', 100), 40)
+    
+    def test_cancel_and_reschedule(self):
+        wheel = TimerWheel(slots=8, levels=2)
+        wheel.schedule('a', 5, noop)
+        wheel.schedule('b', 5, noop)
+        self.assertTrue(wheel.cancel('a'))
+        self.assertFalse(wheel.cancel('a'))
+        
+        for _ in range(3):
+            wheel.advance()
+        wheel.schedule('b', 10, noop)  # Reprogramar reemplaza
+        
+        self.assertEqual(advance_until_fired(wheel, 'b', 50), 13)
+        self.assertEqual(wheel.timers, {})
+
+class GameTimeoutTest(unittest.TestCase):
+    
+    def setUp(self):
+        self.original_wheel = server.timer_wheel
+        server.timer_wheel = TimerWheel()
+    
+    def tearDown(self):
+        server.timer_wheel = self.original_wheel
+        server.game_state.__init__()
+    
+    async def run_ticks(self, ticks: int):
+        for _ in range(ticks):
+            for timer in server.timer_wheel.advance():
+                await timer.callback()
+    
+    def test_turn_expires_and_advances(self):
+        async def scenario():
+            await server.handle_start_game({
+                'players': PLAYERS, 'turn_timeout': 3, 'idle_timeout': 100
+            })
+            await self.run_ticks(2)
+            self.assertEqual(server.game_state.current_player, 1)
+            await self.run_ticks(1)
+            self.assertEqual(server.game_state.current_player, 2)
+            # El nuevo turno tiene su propio timeout
+            await self.run_ticks(3)
+            self.assertEqual(server.game_state.current_player, 1)
+        
+        asyncio.run(scenario())
+        self.assertEqual(server.game_state.turn_number, 2)
+    
+    def test_idle_game_is_closed(self):
+        async def scenario():
+            await server.handle_start_game({
+                'players': PLAYERS, 'turn_timeout': 0, 'idle_timeout': 5
+            })
+            await self.run_ticks(3)
+            # Actividad: reinicia el timeout de inactividad
+            await server.handle_dice_rolled({'player_id': 1, 'value': 2})
+            await self.run_ticks(4)
+            self.assertTrue(server.game_state.game_started)
+            await self.run_ticks(1)
+        
+        asyncio.run(scenario())
+        self.assertFalse(server.game_state.game_started)
+        self.assertEqual(server.game_state.players, {})
+        self.assertEqual(server.timer_wheel.timers, {})
+    
+    def test_turn_timeouts_do_not_keep_game_alive(self):
+        async def scenario():
+            await server.handle_start_game({
+                'players': PLAYERS, 'turn_timeout': 2, 'idle_timeout': 9
+            })
+            await self.run_ticks(8)
+            # Los turnos avanzan solos, pero no cuentan como actividad
+            self.assertEqual(server.game_state.turn_number, 4)
+            self.assertTrue(server.game_state.game_started)
+            await self.run_ticks(1)
+        
+        asyncio.run(scenario())
+        self.assertFalse(server.game_state.game_started)
+        self.assertEqual(server.timer_wheel.timers, {})
+    
+    def test_default_timeouts_close_abandoned_game(self):
+        async def scenario():
+            await server.handle_start_game({'players': PLAYERS})
+            await self.run_ticks(server.ROOM_IDLE_TIMEOUT)
+        
+        asyncio.run(scenario())
+        self.assertFalse(server.game_state.game_started)
+    
+    def test_invalid_timeouts_are_rejected(self):
+        for bad in ('60', -1, True, float('nan'), float('inf')):
+            websocket = FakeWebSocket()
+            asyncio.run(server.route_message({
+                'event': 'start_game',
+                'data': {'players': PLAYERS, 'turn_timeout': bad}
+            }, websocket))
+            
+            self.assertFalse(server.game_state.game_started)
+            self.assertEqual([m['event'] for m in websocket.sent], ['error'])
+            self.assertEqual(server.timer_wheel.timers, {})
+
+class TimerWheelRunTest(unittest.IsolatedAsyncioTestCase):
+    
+    async def test_slow_callback_does_not_block_wheel(self):
+        wheel = TimerWheel(tick=0.01)
+        fired = []
+        
+        async def slow():
+            await asyncio.sleep(10)
+        
+        async def fast():
+            fired.append(wheel.current_tick)
+        
+        wheel.schedule('slow', 0.01, slow)
+        wheel.schedule('fast', 0.05, fast)
+        
+        runner = asyncio.create_task(wheel.run())
+        await asyncio.sleep(0.3)
+        runner.cancel()
+        
+        self.assertEqual(len(fired), 1)
+        self.assertEqual(len(wheel.tasks), 1)  # La lenta sigue en curso
+        for task in wheel.tasks:
+            task.cancel()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -14,11 +14,17 @@ import GameLog from './components/GameLog';
 // Configuración del servidor WebSocket
 const WS_URL = process.env.REACT_APP_BACKEND_URL || 'ws://localhost:5000';
 
+// Reconexión: backoff exponencial con jitter (ms)
+const RECONNECT_BASE_MS = 1000;
+const RECONNECT_MAX_MS = 30000;
+
 function App() {
   // Estado de conexión
   const [connected, setConnected] = useState(false);
   const [esp32Connected, setEsp32Connected] = useState(false);
   const wsRef = useRef(null);
+  const reconnectAttemptsRef = useRef(0);
+  const restartHintRef = useRef(null);
 
   // Estado del juego
   const [gameState, setGameState] = useState({
@@ -52,6 +58,27 @@ function App() {
     setGameLogs(prev => [newLog, ...prev].slice(0, 50)); // Mantener últimos 50 logs
   };
 
+  /**
+   * Calcula la espera antes de reconectar
+   * El primer reintento tras un reinicio usa el aviso del servidor; los
+   * siguientes usan backoff exponencial con jitter para no llegar todos juntos
+   * @returns {number} Milisegundos de espera
+   */
+  const getReconnectDelay = () => {
+    if (restartHintRef.current !== null) {
+      const hint = restartHintRef.current;
+      restartHintRef.current = null;
+      return hint;
+    }
+
+    const backoff = Math.min(
+      RECONNECT_MAX_MS,
+      RECONNECT_BASE_MS * 2 ** reconnectAttemptsRef.current
+    );
+    reconnectAttemptsRef.current += 1;
+    return backoff / 2 + Math.random() * (backoff / 2);
+  };
+
   /**
    * Establece conexión WebSocket con el servidor
    */
@@ -65,6 +92,7 @@ function App() {
 
       ws.onopen = () => {
         console.log('✅ WebSocket conectado');
+        reconnectAttemptsRef.current = 0;
         setConnected(true);
         addLog('Conectado al servidor exitosamente', 'success');
 
@@ -77,14 +105,16 @@ function App() {
         setConnected(false);
         addLog('Desconectado del servidor', 'warning');
 
-        // Reintentar conexión después de 3 segundos
+        // Reintentar conexión (aviso del servidor o backoff con jitter)
+        const delay = getReconnectDelay();
+        console.log(`🔄 Reintento en ${Math.round(delay)} ms`);
         setTimeout(() => {
           if (!wsRef.current || wsRef.current.readyState === WebSocket.CLOSED) {
             console.log('🔄 Reintentando conexión...');
             addLog('Reintentando conexión...', 'info');
             connectWebSocket();
           }
-        }, 3000);
+        }, delay);
       };
 
       ws.onerror = (error) => {
@@ -200,6 +230,23 @@ function App() {
         addLog('ESP32 conectada al sistema', 'success');
         break;
 
+      case 'game_closed':
+        console.log(`💤 Partida cerrada: ${data.reason}`);
+        sendMessage({ event: 'get_state', data: {} });
+        addLog('Partida cerrada por inactividad', 'warning');
+        break;
+
+      case 'server_restarting':
+        console.log(`🔄 Servidor reiniciando, reconexión en ${data.reconnect_in_ms} ms`);
+        restartHintRef.current = data.reconnect_in_ms;
+        addLog('El servidor se está reiniciando, reconectando...', 'warning');
+        break;
+
+      case 'error':
+        console.error('❌ Error del servidor:', data.message);
+        addLog(data.message, 'error');
+        break;
+
       case 'esp32_disconnected':
         console.log('❌ ESP32 desconectada');
         setEsp32Connected(false);